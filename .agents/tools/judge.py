@@ -1,22 +1,84 @@
 #!/usr/bin/env python3
-import json, time
-from util import ROOT, SCORE_FILE
+import json, signal, sys, time
+from util import ROOT, SCORE_FILE, atomic_write_json, ensure_dirs
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # non-Linux or package missing: fall back to polling
+    INotify = None
 
 DONE = ROOT/"queue/done"
 FAILED = ROOT/"queue/failed"
+FLUSH_INTERVAL = 0.25  # seconds between scoreboard writes while results keep arriving
+FLUSH_EVERY = 128      # ...unless this many updates pile up first
 
 def load_score():
     try: return json.loads(SCORE_FILE.read_text())
     except: return {"pass":0,"fail":0}
 
 def save_score(s):
-    SCORE_FILE.write_text(json.dumps(s, indent=2))
+    atomic_write_json(SCORE_FILE, s, indent=2)
 
-if __name__=="__main__":
-    s = load_score()
+class Tally:
+    """Counts in memory; the scoreboard file is rewritten at most every FLUSH_INTERVAL."""
+    def __init__(self, s):
+        self.s, self.pending, self.last = s, 0, time.monotonic()
+
+    def bump(self, key):
+        self.s[key] += 1; self.pending += 1
+        if self.pending >= FLUSH_EVERY: self.flush()
+
+    def wait_ms(self):
+        # how long the next read may block: forever when idle, else until the flush is due
+        if not self.pending: return None
+        return max(0, int((self.last + FLUSH_INTERVAL - time.monotonic()) * 1000))
+
+    def flush(self):
+        if self.pending: save_score(self.s)
+        self.pending, self.last = 0, time.monotonic()
+
+def sweep(t):
+    for p in list(DONE.glob("*.json")):
+        t.bump("pass"); p.unlink(missing_ok=True)
+    for p in list(FAILED.glob("*.json")):
+        t.bump("fail"); p.unlink(missing_ok=True)
+
+def poll(t):
+    while True:
+        sweep(t); t.flush()
+        time.sleep(1)
+
+def watch(t):
+    ino = INotify()
+    mask = flags.MOVED_TO | flags.CLOSE_WRITE
+    dirs = {ino.add_watch(str(DONE), mask): (DONE, "pass"),
+            ino.add_watch(str(FAILED), mask): (FAILED, "fail")}
+    # pick up anything that landed before the watches existed
+    sweep(t); t.flush()
     while True:
-        for p in list(DONE.glob("*.json")):
-            s["pass"] += 1; p.unlink(missing_ok=True)
-        for p in list(FAILED.glob("*.json")):
-            s["fail"] += 1; p.unlink(missing_ok=True)
-        save_score(s); time.sleep(1)
+        for ev in ino.read(timeout=t.wait_ms()):
+            if ev.mask & flags.Q_OVERFLOW:
+                sweep(t); continue
+            if ev.wd not in dirs or not ev.name.endswith(".json"): continue
+            d, key = dirs[ev.wd]
+            try: (d/ev.name).unlink()
+            except FileNotFoundError: continue  # already counted by a sweep
+            t.bump(key)
+        if t.wait_ms() == 0: t.flush()
+
+def _stop(*_):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.exit(0)
+
+if __name__=="__main__":
+    ensure_dirs()
+    for d in (DONE, FAILED): d.mkdir(parents=True, exist_ok=True)
+    signal.signal(signal.SIGTERM, _stop)
+    t = Tally(load_score())
+    try:
+        if INotify is None: poll(t)
+        else: watch(t)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        t.flush()  # don't lose counts still waiting for the next flush
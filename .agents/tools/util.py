@@ -1,6 +1,17 @@
-import os, json, time, uuid, shutil, subprocess, tempfile
+import os, json, time, uuid, atexit, functools, queue, shutil, subprocess, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # non-Linux or package missing: fall back to polling
+    INotify = None
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback
+    orjson = None
+
 ROOT = Path(__file__).resolve().parents[2] / ".agents"
 INBOX = ROOT/"queue/inbox"
 RUNNING = ROOT/"queue/running"
@@ -10,6 +21,16 @@ PATCHES = ROOT/"patches"
 LOG_FILE = ROOT/"logs"/"run.jsonl"
 SCORE_FILE = ROOT/"scores"/"scoreboard.json"
 AGENTS_RULES = ROOT/"docs"/"rules.agents.md"
+SCRATCH = ROOT/"scratch"
+
+_inbox_q: "queue.Queue[Path]" = queue.Queue()
+_log_q: "queue.Queue[bytes | None]" = queue.Queue()
+_log_writer = None
+_log_lock = threading.Lock()
+_prompt_dir = None
+_io_pool = ThreadPoolExecutor(max_workers=16)  # overlaps rules reads on slow filesystems
+_watcher = None
+_watcher_lock = threading.Lock()
 
 
 def claude_available() -> bool:
@@ -20,15 +41,50 @@ def ensure_dirs():
     for p in [INBOX, RUNNING, DONE, FAILED, PATCHES, LOG_FILE.parent, SCORE_FILE.parent]:
         p.mkdir(parents=True, exist_ok=True)
 
+def _write_all(fd, data: bytes):
+    # a single os.write may be short; keep going until every byte is out
+    view = memoryview(data)
+    while view: view = view[os.write(fd, view):]
+
+def _write_logs():
+    # single writer: one O_APPEND write per batch of up to 256 lines
+    fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    while True:
+        batch = [_log_q.get()]
+        while batch[-1] is not None and len(batch) < 256:
+            try: batch.append(_log_q.get_nowait())
+            except queue.Empty: break
+        stop = batch[-1] is None
+        if stop: batch.pop()
+        _write_all(fd, b"".join(batch))
+        if stop: os.close(fd); return
+
+def flush_logs():
+    if _log_writer is not None and _log_writer.is_alive():
+        _log_q.put(None)
+        _log_writer.join(timeout=5)
+
 def logj(obj):
-    ensure_dirs()
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False)+"\n")
+    global _log_writer
+    if _log_writer is None:
+        with _log_lock:
+            if _log_writer is None:
+                ensure_dirs()
+                _log_writer = threading.Thread(target=_write_logs, daemon=True)
+                _log_writer.start()
+                atexit.register(flush_logs)
+    _log_q.put(json.dumps(obj, ensure_ascii=False).encode("utf-8")+b"\n")
 
-def atomic_write_json(path: Path, data: dict):
+def atomic_write_json(path: Path, data: dict, indent: int | None = None, durable: bool = True):
+    payload = json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2))
-    tmp.rename(path)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _write_all(fd, payload)
+        if durable: os.fsync(fd)  # on disk before the rename makes it visible
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
 
 def enqueue(prompt: str, repo: str, mode: str = "code_apply", hint: str | None = None):
     ensure_dirs()
@@ -39,22 +95,61 @@ def enqueue(prompt: str, repo: str, mode: str = "code_apply", hint: str | None =
     atomic_write_json(dst, task)
     return tid, dst
 
-def claim():
+def _seed_inbox():
+    # one unsorted pass; uuid names carry no arrival order worth sorting for
+    with os.scandir(INBOX) as it:
+        for e in it:
+            if e.name.endswith(".json"): _inbox_q.put(Path(e.path))
+
+def _watch_inbox(ino):
+    if ino is None:
+        while True:
+            time.sleep(0.2)
+            # rescan only once this process has drained what it already queued
+            if _inbox_q.empty(): _seed_inbox()
+    while True:
+        for ev in ino.read():
+            if ev.mask & flags.Q_OVERFLOW: _seed_inbox()
+            elif ev.name.endswith(".json"): _inbox_q.put(INBOX/ev.name)
+
+def _ensure_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            ino = None
+            if INotify is not None:
+                ino = INotify()
+                ino.add_watch(str(INBOX), flags.MOVED_TO | flags.CLOSE_WRITE)
+            # seed here, after add_watch, so the first claim() already sees queued files
+            _seed_inbox()
+            _watcher = threading.Thread(target=_watch_inbox, args=(ino,), daemon=True)
+            _watcher.start()
+
+def claim(block: bool = False, timeout: float | None = None):
+    # block=True sleeps on the queue until the watcher hands over a new task
     ensure_dirs()
-    for p in sorted(INBOX.glob("*.json")):
+    _ensure_watcher()
+    while True:
+        try: p = _inbox_q.get(block, timeout)
+        except queue.Empty: return None
         try:
             tgt = RUNNING/p.name
-            p.rename(tgt)  # atomic claim
+            p.rename(tgt)  # atomic claim; another worker may have won the race
             return tgt
         except Exception:
             continue
-    return None
+
+def read_json(p: Path):
+    # one bytes read, decoded straight from UTF-8 by the JSON parser
+    with open(p, "rb") as f: data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 def finish(tpath: Path, ok: bool):
     dst = (DONE if ok else FAILED) / tpath.name
     tpath.rename(dst)
     return dst
 
+@functools.lru_cache(maxsize=1)
 def _cli_supports_dash_p() -> bool:
     if not claude_available():
         return False
@@ -64,36 +159,40 @@ def _cli_supports_dash_p() -> bool:
     except Exception:
         return False
 
-def claude_plan_apply(repo: Path, plan_md: str, apply_md: str):
+def _write_prompt(name: str, text: str) -> Path:
+    # one reusable file per name and worker process, rewritten in place for each task
+    global _prompt_dir
+    if _prompt_dir is None:
+        _prompt_dir = SCRATCH/f"w{os.getpid()}"
+        _prompt_dir.mkdir(parents=True, exist_ok=True)
+        atexit.register(shutil.rmtree, _prompt_dir, ignore_errors=True)
+    p = _prompt_dir/name
+    p.write_text(text, encoding="utf-8")
+    return p
+
+def claude_plan_apply(repo: Path, plan_md: str, apply_md: str, out_path: Path, err_path: Path) -> int:
     """
     Plan then apply using Claude CLI only.
     Prefer `claude -p` if available, else `claude code plan/apply`.
+    Both runs append straight to out_path/err_path, separated by `---`.
     """
     if not claude_available():
         raise FileNotFoundError(
             "Claude CLI ('claude') not found on PATH. Install the claude binary to run workers."
         )
-    def run(args, input_text=None):
-        return subprocess.run(args, input=input_text, capture_output=True, text=True, timeout=600)
-
-    if _cli_supports_dash_p():
-        p1 = run(["claude","-p", plan_md])
-        p2 = run(["claude","-p", apply_md])
-        rc = p2.returncode
-        out = (p1.stdout or "") + "\n---\n" + (p2.stdout or "")
-        err = (p1.stderr or "") + "\n---\n" + (p2.stderr or "")
-        return rc, out, err
-    else:
-        with tempfile.NamedTemporaryFile("w+", suffix=".md", delete=False) as f1:
-            f1.write(plan_md); f1.flush()
-            p_plan = run(["claude","code","plan","--repo", str(repo), "--plan", f1.name])
-        with tempfile.NamedTemporaryFile("w+", suffix=".md", delete=False) as f2:
-            f2.write(apply_md); f2.flush()
-            p_apply = run(["claude","code","apply","--repo", str(repo), "--plan", f2.name])
-        rc = p_apply.returncode
-        out = (p_plan.stdout or "") + "\n---\n" + (p_apply.stdout or "")
-        err = (p_plan.stderr or "") + "\n---\n" + (p_apply.stderr or "")
-        return rc, out, err
+    with open(out_path, "ab", buffering=0) as out, open(err_path, "ab", buffering=0) as err:
+        def run(args):
+            return subprocess.run(args, stdout=out, stderr=err, timeout=600).returncode
+        def sep():
+            out.write(b"\n---\n"); err.write(b"\n---\n")
+
+        if _cli_supports_dash_p():
+            run(["claude","-p", plan_md])
+            sep()
+            return run(["claude","-p", apply_md])
+        run(["claude","code","plan","--repo", str(repo), "--plan", str(_write_prompt("plan.md", plan_md))])
+        sep()
+        return run(["claude","code","apply","--repo", str(repo), "--plan", str(_write_prompt("apply.md", apply_md))])
 
 def read_file(p: Path) -> str:
     return p.read_text(encoding="utf-8") if p.exists() else ""
@@ -103,15 +202,46 @@ def load_host_rules(repo_root: Path) -> str:
     rules_file = repo_root/"docs"/"rules.md"
     if rules_file.exists():
         return rules_file.read_text(encoding="utf-8")
+    # scandir hands back the entry type with the listing: no stat per file
+    try:
+        with os.scandir(repo_root/"docs"/"rules") as it:
+            entries = sorted((e for e in it if e.name.endswith(".md") and not e.name.startswith(".") and e.is_file()),
+                             key=lambda e: e.name)
+    except OSError:
+        return ""
+    paths = [Path(e.path) for e in entries]
+    texts = _io_pool.map(read_file, paths) if len(paths) > 4 else map(read_file, paths)
+    return "".join(f"\n\n# {p.stem}\n\n{t}" for p, t in zip(paths, texts))
+
+def _mtime_ns(p: Path):
+    try: return os.stat(p).st_mtime_ns
+    except OSError: return None
+
+def _rules_stamp(repo_root: Path) -> tuple:
+    # one stat per input; the dir mtime covers rules files being added/removed
+    agents = _mtime_ns(AGENTS_RULES)
+    rules_md = _mtime_ns(repo_root/"docs"/"rules.md")
+    if rules_md is not None:
+        return (agents, rules_md)
     rules_dir = repo_root/"docs"/"rules"
-    if rules_dir.exists():
-        parts = []
-        for f in sorted(rules_dir.glob("*.md")):
-            parts.append(f"\n\n# {f.stem}\n\n"+read_file(f))
-        return "".join(parts)
-    return ""
+    newest = 0
+    try:
+        with os.scandir(rules_dir) as it:
+            for e in it:
+                if not e.name.endswith(".md"): continue
+                try: newest = max(newest, e.stat().st_mtime_ns)
+                except OSError: continue  # dangling symlink etc.; load_host_rules skips it too
+    except (FileNotFoundError, NotADirectoryError):
+        return (agents, None)
+    except OSError:
+        return (agents, None, "scan-error", time.monotonic_ns())  # one-off stamp: never cached
+    return (agents, None, _mtime_ns(rules_dir), newest)
 
 def combined_rules(repo_root: Path) -> str:
+    return _combined_rules_cached(repo_root, _rules_stamp(repo_root))
+
+@functools.lru_cache(maxsize=64)
+def _combined_rules_cached(repo_root: Path, stamp: tuple) -> str:
     host = load_host_rules(repo_root)
     agents = read_file(AGENTS_RULES)
     if host and agents:
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import json, time
+import signal, sys, time
 from pathlib import Path
 from util import (
     PATCHES,
@@ -9,25 +9,40 @@ from util import (
     combined_rules,
     finish,
     logj,
+    read_json,
 )
 
 PLAN_PROMPT_PATH = Path(__file__).with_name("plan_prompt.md")
-PLAN_BASE = PLAN_PROMPT_PATH.read_text(encoding="utf-8") if PLAN_PROMPT_PATH.exists() else ""
+_prompt_mtime = None  # st_mtime_ns of plan_prompt.md behind _prompt_prefix; None if missing
+_prompt_prefix = "\n\n## Constraints and Risks\n"
 
 
+def plan_prefix() -> str:
+    # one stat per task; re-read plan_prompt.md only after it has been edited
+    global _prompt_mtime, _prompt_prefix
+    try: mtime = PLAN_PROMPT_PATH.stat().st_mtime_ns
+    except OSError: mtime = None
+    if mtime != _prompt_mtime:
+        base = PLAN_PROMPT_PATH.read_text(encoding="utf-8") if mtime is not None else ""
+        _prompt_mtime, _prompt_prefix = mtime, base + "\n\n## Constraints and Risks\n"
+    return _prompt_prefix
+
 def build_plan_prompt(rules: str) -> str:
     rules_section = rules.strip() if rules and rules.strip() else "_No additional rules found._"
-    return f"{PLAN_BASE}\n\n## Constraints and Risks\n{rules_section}"
+    return plan_prefix() + rules_section
 
 def run_once():
-    tpath = claim()
+    tpath = claim(block=True)
     if not tpath:
-        time.sleep(0.2); return
-    task = json.loads(tpath.read_text())
+        return
+    task = read_json(tpath)
     t0 = time.time()
     ok = False
-    out = ""
     err = ""
+    ap = PATCHES/task["id"]
+    ap.mkdir(parents=True, exist_ok=True)
+    out_path, err_path = ap/"stdout.txt", ap/"stderr.txt"
+    out_path.write_bytes(b""); err_path.write_bytes(b"")
     try:
         repo_root = Path(task.get("repo",".")).resolve()
         rules = combined_rules(repo_root)
@@ -36,18 +51,22 @@ def run_once():
         if not claude_available():
             err = "Claude CLI ('claude') not found on PATH. Install the claude CLI to process tasks."
         else:
-            rc, out, err = claude_plan_apply(repo_root, plan_md, apply_md)
+            rc = claude_plan_apply(repo_root, plan_md, apply_md, out_path, err_path)
             ok = (rc == 0)
     except Exception as e:
         err = f"{type(e).__name__}: {e}"
         ok = False
-    ap = PATCHES/task["id"]
-    ap.mkdir(parents=True, exist_ok=True)
-    (ap/"stdout.txt").write_text(out)
-    (ap/"stderr.txt").write_text(err)
+    if err:
+        with open(err_path, "a", encoding="utf-8") as f: f.write(err)
     finish(tpath, ok)
     logj({"id": task["id"], "ok": ok, "latency_s": round(time.time()-t0, 3)})
 
+def _stop(*_):
+    # unwind so atexit cleanup runs; ignore repeat signals (e.g. sent to the process group)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.exit(0)
+
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _stop)
     while True:
         run_once()
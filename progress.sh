@@ -94,6 +94,10 @@ def locate_job_file(job_id: str) -> Tuple[Optional[str], Optional[Path]]:
         candidate = directory / f"{job_id}.json"
         if candidate.exists():
             return status, candidate
+        if status == "queued":
+            # Queued jobs wait in per-worker shards: inbox/w<N>/<job_id>.json
+            for candidate in directory.glob(f"w*/{job_id}.json"):
+                return status, candidate
     return None, None
 
 
@@ -2,18 +2,37 @@
 """TaskArena SaaS background service."""
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
 import hashlib
-import http.server
 import json
 import os
+import queue
+import random
+import re
 import shutil
+import signal
+import string
 import subprocess
 import threading
 import time
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import Optional
+from typing import Callable, Optional
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # pragma: no cover - optional, Linux-only accelerator
+    INotify = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
 
 STATE_DIR = Path.home() / ".taskarena"
 QUEUE_DIR = STATE_DIR / "queue"
@@ -24,9 +43,14 @@ FAILED_DIR = QUEUE_DIR / "failed"
 LOG_FILE = STATE_DIR / "logs" / "run.jsonl"
 PATCH_DIR = STATE_DIR / "patches"
 RULES_FILE = STATE_DIR / "rules" / "agents.md"
+CAPS_FILE = STATE_DIR / "claude_caps.json"
+PROMPT_DIR = STATE_DIR / "tmp"
 WORKER_COUNT = max(int(os.environ.get("TA_WORKERS", "4")), 1)
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8787
+SERVER_VERSION = "TaskArenaHTTP/1.0"
+_REPO_SLUG_RE = re.compile(r"[^\w-]")
+_ARTIFACT_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
 
 _PLAN_TEMPLATE = """# TaskArena Planning Request
 
@@ -66,7 +90,19 @@ Follow the approved plan. Explain the changes you make and ensure artifacts are
 """
 
 _LOG_LOCK = threading.Lock()
-_QUEUE_LOCK = threading.Lock()
+_LOG_BATCH = 256
+_log_q: queue.Queue[Optional[bytes]] = queue.Queue()
+_log_writer: Optional[LogWriter] = None
+_inbox_qs: list[queue.Queue[Path]] = [queue.Queue() for _ in range(WORKER_COUNT)]
+_inbox_ready = threading.Semaphore(0)
+_inbox_wake = threading.Event()
+_STEAL_BACKOFF_MIN = 0.001
+_STEAL_BACKOFF_MAX = 0.05
+_PROBE_LOCK = threading.Lock()
+_prompt_files = threading.local()
+# Shared pool for overlapping blocking reads (rules directories on NFS/sshfs).
+_IO_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="taskarena-io")
+_PARALLEL_READ_MIN = 5
 _SUPPORTS_CACHE: Optional[bool] = None
 _CLAUDE_PATH: Optional[str] = None
 
@@ -74,35 +110,100 @@ _CLAUDE_PATH: Optional[str] = None
 def ensure_directories() -> None:
     for path in [STATE_DIR, QUEUE_DIR, INBOX_DIR, RUNNING_DIR, DONE_DIR, FAILED_DIR, PATCH_DIR, LOG_FILE.parent, RULES_FILE.parent]:
         path.mkdir(parents=True, exist_ok=True)
+    for shard in range(WORKER_COUNT):
+        shard_dir(shard).mkdir(exist_ok=True)
     LOG_FILE.touch(exist_ok=True)
 
 
-def atomic_write_json(path: Path, payload: dict) -> None:
+def _write_all(fd: int, data: bytes) -> None:
+    """``os.write`` until all of ``data`` is written; a single call may write only part of it."""
+
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def atomic_write_json(path: Path, payload: dict, indent: Optional[int] = None, durable: bool = True) -> None:
+    """Write ``payload`` to ``path`` via a temp file and rename so readers never see a partial file.
+
+    ``durable`` fsyncs the temp file first, so a crash cannot leave an empty file behind; skip it
+    only for data that can be regenerated.
+    """
+
+    data = json.dumps(payload, ensure_ascii=False, indent=indent).encode("utf-8")
     tmp_path = path.with_suffix(path.suffix + ".tmp")
-    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _write_all(fd, data)
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
     os.replace(tmp_path, path)
 
 
+def shard_dir(shard: int) -> Path:
+    return INBOX_DIR / f"w{shard}"
+
+
+def shard_for(key: str) -> int:
+    """Map a routing key onto a worker shard; stable across restarts, unlike ``hash()``."""
+
+    return zlib.crc32(key.encode("utf-8")) % WORKER_COUNT
+
+
 def enqueue_job(job: dict) -> Path:
     ensure_directories()
-    job_file = INBOX_DIR / f"{job['id']}.json"
+    # Spread jobs evenly; any idle worker steals, so the shard does not pin a job to a worker.
+    shard = shard_for(job["id"])
+    job_file = shard_dir(shard) / f"{job['id']}.json"
     atomic_write_json(job_file, job)
+    _inbox_wake.set()
     return job_file
 
 
-def claim_job() -> Optional[Path]:
-    ensure_directories()
-    with _QUEUE_LOCK:
-        for job_file in sorted(INBOX_DIR.glob("*.json")):
-            target = RUNNING_DIR / job_file.name
-            try:
-                os.replace(job_file, target)
-                return target
-            except FileNotFoundError:
+def push_job(shard: int, job_file: Path) -> None:
+    _inbox_qs[shard].put(job_file)
+    _inbox_ready.release()
+
+
+def _take_job(shard: int) -> Path:
+    """Pop from our own shard, otherwise steal from the others starting at a random victim."""
+
+    delay = _STEAL_BACKOFF_MIN
+    while True:
+        try:
+            return _inbox_qs[shard].get_nowait()
+        except queue.Empty:
+            pass
+        start = random.randrange(WORKER_COUNT)
+        for offset in range(WORKER_COUNT):
+            victim = (start + offset) % WORKER_COUNT
+            if victim == shard:
                 continue
-            except PermissionError:
+            try:
+                return _inbox_qs[victim].get_nowait()
+            except queue.Empty:
                 continue
-    return None
+        # The semaphore promised a job; another taker raced us to it, so back off and sweep again.
+        time.sleep(delay)
+        delay = min(delay * 2, _STEAL_BACKOFF_MAX)
+
+
+def claim_job(shard: int) -> Path:
+    """Block until a queued job has been atomically moved into the running directory."""
+
+    while True:
+        _inbox_ready.acquire()
+        job_file = _take_job(shard)
+        target = RUNNING_DIR / job_file.name
+        try:
+            os.replace(job_file, target)
+            return target
+        except FileNotFoundError:
+            continue
+        except PermissionError:
+            continue
 
 
 def finish_job(job_file: Path, success: bool) -> None:
@@ -112,14 +213,24 @@ def finish_job(job_file: Path, success: bool) -> None:
     os.replace(job_file, target)
 
 
+@functools.lru_cache(maxsize=512)
 def compute_repo_key(repo: Path) -> str:
     slug = repo.name.strip().lower() or "project"
-    slug = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "-" for ch in slug)
-    digest = hashlib.sha256(str(repo).encode("utf-8")).hexdigest()[:8]
+    slug = _REPO_SLUG_RE.sub("-", slug)
+    # A 4-byte BLAKE2b digest is exactly the 8 hex characters the key needs; no slicing.
+    digest = hashlib.blake2b(str(repo).encode("utf-8"), digest_size=4).hexdigest()
     slug = slug.strip("-") or "project"
     return f"{slug}-{digest}"
 
 
+def json_loads(data: bytes):
+    """Decode JSON from raw bytes, using orjson when it is installed."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def read_text(path: Path) -> str:
     try:
         return path.read_text(encoding="utf-8")
@@ -133,18 +244,83 @@ def load_host_rules(repo: Path) -> str:
     rules_md = repo / "docs" / "rules.md"
     if rules_md.exists():
         return read_text(rules_md)
+    paths = _rules_dir_files(repo / "docs" / "rules")
+    # A handful of files is cheaper to read inline than to hand off to the pool.
+    contents = _IO_POOL.map(read_text, paths) if len(paths) >= _PARALLEL_READ_MIN else map(read_text, paths)
+    return "\n\n".join(content for content in contents if content)
+
+
+def _rules_dir_files(rules_dir: Path) -> list[Path]:
+    """List ``*.md`` files in ``rules_dir`` by name, typing entries from the directory listing."""
+
+    try:
+        with os.scandir(rules_dir) as entries:
+            files = [
+                entry
+                for entry in entries
+                if entry.name.endswith(".md") and not entry.name.startswith(".") and entry.is_file()
+            ]
+    except OSError:
+        return []
+    return [Path(entry.path) for entry in sorted(files, key=lambda entry: entry.name)]
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """Parse ``template`` once; the returned renderer only joins literals and field values."""
+
+    parts = tuple((literal, field) for literal, field, _spec, _conversion in string.Formatter().parse(template))
+
+    def render(**fields: str) -> str:
+        return "".join([literal + fields[field] if field is not None else literal for literal, field in parts])
+
+    return render
+
+
+_render_plan = compile_template(_PLAN_TEMPLATE)
+_render_apply = compile_template(_APPLY_TEMPLATE)
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _rules_stamp(repo: Path) -> tuple:
+    """Fingerprint the rule sources for ``repo`` so cached text is dropped when any of them change."""
+
+    agents = _mtime_ns(RULES_FILE)
+    rules_md = _mtime_ns(repo / "docs" / "rules.md")
+    if rules_md is not None:
+        return (agents, rules_md)
     rules_dir = repo / "docs" / "rules"
-    if rules_dir.exists() and rules_dir.is_dir():
-        chunks: list[str] = []
-        for child in sorted(rules_dir.glob("*.md")):
-            content = read_text(child)
-            if content:
-                chunks.append(content)
-        return "\n\n".join(chunks)
-    return ""
+    newest = 0
+    try:
+        with os.scandir(rules_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md"):
+                    continue
+                try:
+                    newest = max(newest, entry.stat().st_mtime_ns)
+                except OSError:
+                    # e.g. a dangling symlink; load_host_rules skips it as well.
+                    continue
+    except (FileNotFoundError, NotADirectoryError):
+        return (agents, None)
+    except OSError:
+        # Unreadable right now: use a one-off stamp so nothing is cached for this state.
+        return (agents, None, "scan-error", time.monotonic_ns())
+    # The directory mtime moves when a rules file is added, removed, or renamed.
+    return (agents, None, _mtime_ns(rules_dir), newest)
 
 
 def combined_rules(repo: Path) -> str:
+    return _combined_rules_cached(repo, _rules_stamp(repo))
+
+
+@functools.lru_cache(maxsize=64)
+def _combined_rules_cached(repo: Path, stamp: tuple) -> str:
     host = load_host_rules(repo)
     agents = read_text(RULES_FILE)
     if host and agents:
@@ -190,80 +366,187 @@ def _resolve_claude_cli() -> str:
 
 
 def _detect_supports_dash_p() -> bool:
-    global _SUPPORTS_CACHE
     if _SUPPORTS_CACHE is not None:
         return _SUPPORTS_CACHE
+    # Workers start together; let one of them run `claude --help` while the rest wait.
+    with _PROBE_LOCK:
+        if _SUPPORTS_CACHE is not None:
+            return _SUPPORTS_CACHE
+        return _probe_supports_dash_p()
+
+
+def _probe_supports_dash_p() -> bool:
+    """Resolve ``-p`` support from TA_CLAUDE_DASH_P, the on-disk cache, or `claude --help`."""
+
+    global _SUPPORTS_CACHE
+    override = os.environ.get("TA_CLAUDE_DASH_P")
+    if override in {"0", "1"}:
+        _SUPPORTS_CACHE = override == "1"
+        return _SUPPORTS_CACHE
+    claude_cli = _resolve_claude_cli()
+    # The answer only changes when the CLI binary does, so key the cache on its path and mtime.
+    stamp = {"path": claude_cli, "mtime_ns": _mtime_ns(Path(claude_cli))}
+    try:
+        cached = json.loads(CAPS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = None
+    if isinstance(cached, dict) and all(cached.get(key) == value for key, value in stamp.items()):
+        _SUPPORTS_CACHE = bool(cached.get("dash_p"))
+        return _SUPPORTS_CACHE
     try:
-        claude_cli = _resolve_claude_cli()
         result = subprocess.run([claude_cli, "--help"], capture_output=True, text=True, timeout=10)
-    except RuntimeError:
-        raise
     except Exception:
         _SUPPORTS_CACHE = False
         return _SUPPORTS_CACHE
     help_text = (result.stdout or "") + (result.stderr or "")
     _SUPPORTS_CACHE = "-p" in help_text or "--prompt" in help_text
+    try:
+        atomic_write_json(CAPS_FILE, {**stamp, "dash_p": _SUPPORTS_CACHE}, durable=False)
+    except OSError:
+        pass
     return _SUPPORTS_CACHE
 
 
-def _run_subprocess(args: list[str]) -> subprocess.CompletedProcess[str]:
-    return subprocess.run(args, capture_output=True, text=True)
+def open_artifact(path: Path) -> int:
+    return os.open(path, _ARTIFACT_FLAGS, 0o644)
+
 
+def write_artifact(path: Path, content: str) -> None:
+    """Write ``content`` with one raw open/write/close; empty content creates no file."""
 
-def run_plan(repo: Path, prompt: str, job_id: str) -> tuple[subprocess.CompletedProcess[str], str]:
+    if not content:
+        return
+    fd = open_artifact(path)
+    try:
+        _write_all(fd, content.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def _run_subprocess(args: list[str], artifact_dir: Path, step: str) -> int:
+    """Run ``args`` with output streamed straight into ``<step>.stdout.txt``/``<step>.stderr.txt``.
+
+    Each step gets a fresh CLI process on purpose: the Claude CLI has no framed stdin mode for
+    independent requests, and a long-lived session would carry context and its working
+    directory from one job (and repository) into the next.
+    """
+
+    stdout_fd = open_artifact(artifact_dir / f"{step}.stdout.txt")
+    try:
+        stderr_fd = open_artifact(artifact_dir / f"{step}.stderr.txt")
+        try:
+            return subprocess.run(args, stdout=stdout_fd, stderr=stderr_fd).returncode
+        finally:
+            os.close(stderr_fd)
+    finally:
+        os.close(stdout_fd)
+
+
+def _process_prompt_dir() -> Path:
+    # Scoped by pid so another service process exiting never removes our files.
+    return PROMPT_DIR / str(os.getpid())
+
+
+def _write_prompt_file(name: str, text: str) -> Path:
+    """Rewrite this thread's reusable prompt file ``name`` in place and return its path."""
+
+    directory = getattr(_prompt_files, "directory", None)
+    if directory is None:
+        directory = _process_prompt_dir() / threading.current_thread().name
+        directory.mkdir(parents=True, exist_ok=True)
+        _prompt_files.directory = directory
+    path = directory / name
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    return path
+
+
+def run_plan(repo: Path, prompt: str, job_id: str, artifact_dir: Path) -> tuple[int, str]:
     rules_text = combined_rules(repo)
-    plan_prompt = _PLAN_TEMPLATE.format(job_id=job_id, repo=str(repo), prompt=prompt, rules=rules_text)
+    plan_prompt = _render_plan(job_id=job_id, repo=str(repo), prompt=prompt, rules=rules_text)
     supports_dash = _detect_supports_dash_p()
     claude_cli = _resolve_claude_cli()
     if supports_dash:
-        proc = _run_subprocess([claude_cli, "-p", plan_prompt])
-        return proc, rules_text
-    with NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".md") as handle:
-        handle.write(plan_prompt)
-        handle.flush()
-        temp_path = handle.name
-    try:
-        proc = _run_subprocess([claude_cli, "code", "plan", "--repo", str(repo), "--plan", temp_path])
-    finally:
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
-    return proc, rules_text
+        returncode = _run_subprocess([claude_cli, "-p", plan_prompt], artifact_dir, "plan")
+        return returncode, rules_text
+    plan_file = _write_prompt_file("plan.md", plan_prompt)
+    returncode = _run_subprocess([claude_cli, "code", "plan", "--repo", str(repo), "--plan", str(plan_file)], artifact_dir, "plan")
+    return returncode, rules_text
 
 
-def run_apply(repo: Path, prompt: str, job_id: str, rules_text: str, plan_output: str) -> subprocess.CompletedProcess[str]:
+def run_apply(repo: Path, prompt: str, job_id: str, rules_text: str, plan_output: str, artifact_dir: Path) -> int:
     approved_plan = plan_output.strip() or "Plan output missing."
-    apply_prompt = _APPLY_TEMPLATE.format(job_id=job_id, repo=str(repo), rules=rules_text, plan=approved_plan, prompt=prompt)
+    apply_prompt = _render_apply(job_id=job_id, repo=str(repo), rules=rules_text, plan=approved_plan, prompt=prompt)
     supports_dash = _detect_supports_dash_p()
     claude_cli = _resolve_claude_cli()
     if supports_dash:
-        return _run_subprocess([claude_cli, "-p", apply_prompt])
-    with NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".md") as handle:
-        handle.write(apply_prompt)
-        handle.flush()
-        temp_path = handle.name
-    try:
-        return _run_subprocess([claude_cli, "code", "apply", "--repo", str(repo), "--plan", temp_path])
-    finally:
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
+        return _run_subprocess([claude_cli, "-p", apply_prompt], artifact_dir, "apply")
+    apply_file = _write_prompt_file("apply.md", apply_prompt)
+    return _run_subprocess([claude_cli, "code", "apply", "--repo", str(repo), "--plan", str(apply_file)], artifact_dir, "apply")
+
+
+class LogWriter(threading.Thread):
+    """Append queued log lines to ``LOG_FILE`` in batches from a single thread."""
+
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.fd: Optional[int] = None
+
+    def write(self, data: bytes) -> None:
+        if self.fd is None:
+            LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            self.fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        _write_all(self.fd, data)
+
+    def run(self) -> None:
+        while True:
+            batch = [_log_q.get()]
+            while batch[-1] is not None and len(batch) < _LOG_BATCH:
+                try:
+                    batch.append(_log_q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                # One O_APPEND write per batch keeps lines whole even with other writers.
+                self.write(b"".join(batch))
+            if stop:
+                return
+
+
+def _start_log_writer() -> None:
+    global _log_writer
+    with _LOG_LOCK:
+        if _log_writer is None:
+            _log_writer = LogWriter()
+            _log_writer.start()
+            atexit.register(flush_logs)
+
+
+def flush_logs() -> None:
+    """Stop the log writer once everything queued so far has been written."""
+
+    writer = _log_writer
+    if writer is None or not writer.is_alive():
+        return
+    _log_q.put(None)
+    writer.join(timeout=5)
 
 
 def log_event(entry: dict) -> None:
     entry.setdefault("ts", time.time())
-    with _LOG_LOCK:
-        with LOG_FILE.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if _log_writer is None:
+        _start_log_writer()
+    _log_q.put(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
 
 
 def process_job(job_file: Path) -> None:
-    raw = read_text(job_file)
     try:
-        job = json.loads(raw)
-    except json.JSONDecodeError:
+        with open(job_file, "rb") as handle:
+            job = json_loads(handle.read())
+    except (OSError, ValueError):
         finish_job(job_file, False)
         log_event({"id": job_file.stem, "dir": None, "repo_key": None, "ok": False, "error": "Invalid job JSON"})
         return
@@ -275,58 +558,108 @@ def process_job(job_file: Path) -> None:
     artifact_dir = PATCH_DIR / repo_key / job_id
     artifact_dir.mkdir(parents=True, exist_ok=True)
 
-    def write_artifact(name: str, content: str) -> None:
-        (artifact_dir / name).write_text(content or "", encoding="utf-8")
-
     if not repo.exists() or not repo.is_dir():
         message = f"Repository path does not exist: {repo}"
-        write_artifact("error.txt", message)
+        write_artifact(artifact_dir / "error.txt", message)
         finish_job(job_file, False)
         log_event({"id": job_id, "dir": str(repo), "repo_key": repo_key, "ok": False, "error": message})
         return
     if not prompt:
         message = "Empty prompt provided."
-        write_artifact("error.txt", message)
+        write_artifact(artifact_dir / "error.txt", message)
         finish_job(job_file, False)
         log_event({"id": job_id, "dir": str(repo), "repo_key": repo_key, "ok": False, "error": message})
         return
 
     try:
-        plan_proc, rules_text = run_plan(repo, prompt, job_id)
+        plan_returncode, rules_text = run_plan(repo, prompt, job_id, artifact_dir)
     except RuntimeError as exc:
         error_message = str(exc)
-        write_artifact("stderr.txt", error_message)
+        write_artifact(artifact_dir / "stderr.txt", error_message)
         finish_job(job_file, False)
         log_event({"id": job_id, "dir": str(repo), "repo_key": repo_key, "ok": False, "error": error_message})
         return
 
-    write_artifact("plan.stdout.txt", plan_proc.stdout or "")
-    write_artifact("plan.stderr.txt", plan_proc.stderr or "")
-
-    if plan_proc.returncode != 0:
+    if plan_returncode != 0:
         finish_job(job_file, False)
         log_event({"id": job_id, "dir": str(repo), "repo_key": repo_key, "ok": False, "error": "Plan step failed"})
         return
 
-    apply_proc = run_apply(repo, prompt, job_id, rules_text, plan_proc.stdout or "")
-    write_artifact("apply.stdout.txt", apply_proc.stdout or "")
-    write_artifact("apply.stderr.txt", apply_proc.stderr or "")
+    plan_output = read_text(artifact_dir / "plan.stdout.txt")
+    apply_returncode = run_apply(repo, prompt, job_id, rules_text, plan_output, artifact_dir)
 
-    ok = apply_proc.returncode == 0
+    ok = apply_returncode == 0
     finish_job(job_file, ok)
     log_event({"id": job_id, "dir": str(repo), "repo_key": repo_key, "ok": ok})
 
 
-class Worker(threading.Thread):
+class InboxWatcher(threading.Thread):
+    """Single producer feeding inbox arrivals to the per-worker shard queues."""
+
+    POLL_INTERVAL = 0.5
+
     def __init__(self) -> None:
         super().__init__(daemon=True)
 
+    def seed(self) -> None:
+        # Single unsorted scandir pass: uuid file names carry no arrival order to preserve.
+        # Files in the inbox root (older clients) or in shards left over from a larger
+        # TA_WORKERS are folded into the current shards.
+        with os.scandir(INBOX_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    push_job(shard_for(entry.name[:-5]), Path(entry.path))
+                elif entry.name[:1] == "w" and entry.name[1:].isdigit() and entry.is_dir():
+                    self.seed_shard(int(entry.name[1:]) % WORKER_COUNT, entry.path)
+
+    def seed_shard(self, shard: int, directory: str) -> None:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    push_job(shard, Path(entry.path))
+
     def run(self) -> None:  # pragma: no cover
+        if INotify is None:
+            self.poll()
+            return
+        inotify = INotify()
+        mask = flags.MOVED_TO | flags.CLOSE_WRITE
+        watches = {inotify.add_watch(str(INBOX_DIR), mask): None}
+        for shard in range(WORKER_COUNT):
+            watches[inotify.add_watch(str(shard_dir(shard)), mask)] = shard
+        # Seed after the watches exist so nothing enqueued in between is missed.
+        self.seed()
         while True:
-            job_file = claim_job()
-            if job_file is None:
-                time.sleep(0.5)
-                continue
+            for event in inotify.read():
+                if event.mask & flags.Q_OVERFLOW:
+                    self.seed()
+                    continue
+                if event.wd not in watches or not event.name.endswith(".json"):
+                    continue
+                shard = watches[event.wd]
+                if shard is None:
+                    push_job(shard_for(event.name[:-5]), INBOX_DIR / event.name)
+                else:
+                    push_job(shard, shard_dir(shard) / event.name)
+
+    def poll(self) -> None:  # pragma: no cover
+        while True:
+            # Only rescan once the workers have drained what was already queued.
+            if all(shard_queue.empty() for shard_queue in _inbox_qs):
+                self.seed()
+            # Jobs posted to this process wake us at once; the timeout covers other writers.
+            _inbox_wake.wait(self.POLL_INTERVAL)
+            _inbox_wake.clear()
+
+
+class Worker(threading.Thread):
+    def __init__(self, shard: int) -> None:
+        super().__init__(daemon=True, name=f"w{shard}")
+        self.shard = shard
+
+    def run(self) -> None:  # pragma: no cover
+        while True:
+            job_file = claim_job(self.shard)
             try:
                 process_job(job_file)
             except Exception as exc:
@@ -334,59 +667,118 @@ class Worker(threading.Thread):
                 log_event({"id": job_file.stem, "dir": None, "repo_key": None, "ok": False, "error": f"Worker exception: {exc}"})
 
 
-class TaskArenaRequestHandler(http.server.BaseHTTPRequestHandler):
-    server_version = "TaskArenaHTTP/1.0"
+class RequestError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
 
-    def do_POST(self) -> None:  # pragma: no cover
-        if self.path != "/jobs":
-            self.send_error(404, "Endpoint not found")
-            return
-        length = int(self.headers.get("Content-Length", "0") or 0)
-        data = self.rfile.read(length)
-        try:
-            payload = json.loads(data.decode("utf-8"))
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON payload")
-            return
-        directory = payload.get("dir")
-        prompt = (payload.get("prompt") or "").strip()
-        if not directory or not prompt:
-            self.send_error(400, "Both 'dir' and 'prompt' are required.")
-            return
-        repo = Path(directory).expanduser()
-        if not repo.exists() or not repo.is_dir():
-            self.send_error(400, f"Directory does not exist: {repo}")
-            return
-        job_id = str(uuid.uuid4())
-        repo_key = compute_repo_key(repo)
-        job = {"id": job_id, "dir": str(repo), "repo_key": repo_key, "prompt": prompt}
-        enqueue_job(job)
-        response = json.dumps({"id": job_id, "repo_key": repo_key}).encode("utf-8")
-        self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(response)))
-        self.end_headers()
-        self.wfile.write(response)
-
-    def log_message(self, format: str, *args) -> None:  # pragma: no cover
-        return
+
+def submit_job(payload: dict) -> dict:
+    """Validate a ``POST /jobs`` payload and enqueue it; runs off the event loop."""
+
+    directory = payload.get("dir")
+    prompt = (payload.get("prompt") or "").strip()
+    if not directory or not prompt:
+        raise RequestError(400, "Both 'dir' and 'prompt' are required.")
+    repo = Path(directory).expanduser()
+    if not repo.exists() or not repo.is_dir():
+        raise RequestError(400, f"Directory does not exist: {repo}")
+    job_id = str(uuid.uuid4())
+    repo_key = compute_repo_key(repo)
+    job = {"id": job_id, "dir": str(repo), "repo_key": repo_key, "prompt": prompt}
+    enqueue_job(job)
+    return {"id": job_id, "repo_key": repo_key}
+
+
+async def _read_job_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> dict:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        raise RequestError(400, "Malformed request")
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    parts = request_line.split()
+    if len(parts) != 3:
+        raise RequestError(400, "Malformed request line")
+    method, path, _version = parts
+    if method != "POST":
+        raise RequestError(501, f"Unsupported method ({method!r})")
+    if path != "/jobs":
+        raise RequestError(404, "Endpoint not found")
+    headers: dict[str, str] = {}
+    for line in header_lines:
+        name, _sep, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise RequestError(400, "Invalid Content-Length")
+    if headers.get("expect", "").lower() == "100-continue":
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+    try:
+        data = await reader.readexactly(length)
+        payload = json_loads(data)
+    except (asyncio.IncompleteReadError, ValueError):
+        raise RequestError(400, "Invalid JSON payload")
+    if not isinstance(payload, dict):
+        raise RequestError(400, "Invalid JSON payload")
+    return payload
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:  # pragma: no cover
+    """Serve one ``POST /jobs`` request per connection on the event loop."""
+
+    try:
+        payload = await _read_job_request(reader, writer)
+        loop = asyncio.get_running_loop()
+        # Validation and the queue write touch the filesystem; keep them off the loop.
+        status, body = 200, await loop.run_in_executor(None, submit_job, payload)
+    except RequestError as exc:
+        status, body = exc.status, {"error": str(exc)}
+    except Exception as exc:
+        status, body = 500, {"error": f"Internal error: {exc}"}
+    response = json.dumps(body).encode("utf-8")
+    reason = HTTPStatus(status).phrase
+    writer.write(
+        f"HTTP/1.0 {status} {reason}\r\n"
+        f"Server: {SERVER_VERSION}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(response)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1") + response
+    )
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
 
 
 def start_workers() -> None:
-    for _ in range(WORKER_COUNT):
-        Worker().start()
+    atexit.register(shutil.rmtree, _process_prompt_dir(), ignore_errors=True)
+    InboxWatcher().start()
+    for shard in range(WORKER_COUNT):
+        Worker(shard).start()
+
+
+async def serve_http() -> None:  # pragma: no cover
+    server = await asyncio.start_server(handle_connection, SERVER_HOST, SERVER_PORT)
+    async with server:
+        await server.serve_forever()
+
+
+def _interrupt(signum: int, frame: object) -> None:  # pragma: no cover
+    # Ignore repeats (e.g. a second SIGTERM sent to the process group) while atexit runs.
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
 
 
 def serve() -> None:
     ensure_directories()
+    # systemd and launchd stop the service with SIGTERM; unwind so atexit cleanup runs.
+    signal.signal(signal.SIGTERM, _interrupt)
     start_workers()
-    httpd = http.server.ThreadingHTTPServer((SERVER_HOST, SERVER_PORT), TaskArenaRequestHandler)
     try:
-        httpd.serve_forever()
+        asyncio.run(serve_http())
     except KeyboardInterrupt:
         pass
-    finally:
-        httpd.server_close()
 
 
 if __name__ == "__main__":